@@ -11,7 +11,7 @@ This script can be run in two ways:
 
 This script supports flags to control execution behavior:
   --verbose       : Show detailed execution analysis.
-  --no-greedy     : Disable Greedy Best-First Search optimization.
+  --no-greedy     : Disable greedy AST optimization.
   --no-dp         : Disable Dynamic Programming for evaluation.
 """
 import sys
@@ -34,7 +34,7 @@ def run_file(filepath: str, verbose: bool, use_greedy: bool, use_dp: bool):
     # Instantiate core components based on flags
     lexer = NyundaLexer()
     parser = NyundaParser()
-    interpreter = NyundaInterpreter(use_dp=use_dp)
+    interpreter = NyundaInterpreter(use_dp=use_dp, track_stats=verbose)
     
     # Pipeline
     
@@ -51,8 +51,8 @@ def run_file(filepath: str, verbose: bool, use_greedy: bool, use_dp: bool):
     optimized_ast = ast
     optimizer = None
     if use_greedy:
-        optimizer = GreedyBestFirstOptimizer()
-        if verbose: print("Step 3: Optimizing AST with Greedy Best-First Search...")
+        optimizer = GreedyBestFirstOptimizer(track_transformations=verbose)
+        if verbose: print("Step 3: Optimizing AST with greedy rewrites...")
         optimized_ast, transformations = optimizer.optimize(ast)
         if verbose:
             if transformations:
@@ -82,11 +82,15 @@ def run_file(filepath: str, verbose: bool, use_greedy: bool, use_dp: bool):
         print("Greedy Optimization:")
         if use_greedy and optimizer:
             opt_stats = optimizer.get_stats()
-            print(f"  - Search States Explored: {opt_stats['states_explored']}")
+            print(f"  - Nodes Visited: {opt_stats['nodes_visited']}")
             print(f"  - Transformations Applied: {opt_stats['transformations_applied']}")
         else:
             print("  - Status: Disabled")
             
+        # Interpreter stats
+        print("Interpreter:")
+        print(f"  - Nodes Executed: {interpreter.execution_count}")
+
         # DP stats
         dp_stats = interpreter.get_dp_stats()
         print("Dynamic Programming:")
@@ -155,7 +159,7 @@ if __name__ == "__main__":
     parser.add_argument(
         '--no-greedy', 
         action='store_true', 
-        help='Disable the Greedy Best-First Search AST optimization pass.'
+        help='Disable the greedy AST optimization pass.'
     )
     
     parser.add_argument(
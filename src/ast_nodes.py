@@ -4,34 +4,97 @@ Defines the structure of the Abstract Syntax Tree (AST).
 Each node represents a part of the code's structure and includes a cost
 calculation to estimate its execution complexity.
 """
+import math
+import operator
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, FrozenSet, Optional, Tuple
+
+# Binary operator symbol -> implementing function, resolved once per node
+BINARY_OPERATORS = {
+    '+': operator.add, '-': operator.sub,
+    '*': operator.mul, '/': operator.truediv,
+    '%': operator.mod, '**': operator.pow,
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '>': operator.gt,
+    '<=': operator.le, '>=': operator.ge,
+}
+
+# Heuristic cost per binary operator; unknown operators cost 5
+_OP_COSTS = {
+    '**': 20, '*': 8, '/': 10, '%': 12, '+': 3, '-': 3,
+    '==': 4, '!=': 4, '<': 4, '>': 4, '<=': 4, '>=': 4
+}
 
 # AST Node Definitions
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode(ABC):
     """Base class for all AST nodes with cost tracking."""
-    cost: int = field(default=0, init=False)
-
-    def __post_init__(self):
-        self.cost = self.calculate_cost()
+    # Computed lazily by the `cost` property, so runs that never read the
+    # cost (e.g. --no-greedy without --verbose) skip the traversal. Nodes are
+    # never mutated (rewrites build new nodes), so the value stays valid.
+    _cost: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # Structural representation cached by the DP evaluator (see evaluator.py)
+    _repr_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # Names of the variables an expression reads (see evaluator.get_read_vars)
+    _read_vars: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    @property
+    def cost(self) -> int:
+        """Execution cost of this node, calculated on first access."""
+        cost = self._cost
+        if cost is not None:
+            return cost
+
+        # Iterative post-order walk over the descendants without a cost yet:
+        # a node is revisited once its children are filled in, so
+        # calculate_cost only reads cached child costs and deep trees cost
+        # no Python recursion
+        stack = [(self, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node._cost is not None:
+                continue
+            if children_done:
+                node._cost = node.calculate_cost()
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in _child_nodes(node))
+        return self._cost
 
     @abstractmethod
     def calculate_cost(self) -> int:
         """Calculate execution cost of this node."""
         pass
 
-@dataclass
+@dataclass(slots=True)
 class NumberNode(ASTNode):
     """Node for numeric literals."""
     value: float
 
+    def __hash__(self):
+        # Value-based, consistent with the dataclass __eq__
+        return hash(self.value)
+
     def calculate_cost(self) -> int:
         return 1
 
-@dataclass
+# Shared nodes for small non-negative integral literals. Nodes are never
+# mutated, so one instance can stand in for every occurrence of the value.
+_SMALL_NUMBERS = {float(i): NumberNode(float(i)) for i in range(256)}
+ZERO = _SMALL_NUMBERS[0.0]
+ONE = _SMALL_NUMBERS[1.0]
+
+def make_number(value: float) -> NumberNode:
+    """Return a NumberNode for `value`, reusing a shared node when one exists."""
+    if type(value) is float:
+        node = _SMALL_NUMBERS.get(value)
+        # -0.0 == 0.0, so check the sign to keep negative zero distinct
+        if node is not None and (value or math.copysign(1.0, value) > 0):
+            return node
+    return NumberNode(value)
+
+@dataclass(slots=True)
 class StringNode(ASTNode):
     """Node for string literals."""
     value: str
@@ -39,7 +102,7 @@ class StringNode(ASTNode):
     def calculate_cost(self) -> int:
         return 1
 
-@dataclass
+@dataclass(slots=True)
 class VariableNode(ASTNode):
     """Node for variable identifiers."""
     name: str
@@ -47,70 +110,91 @@ class VariableNode(ASTNode):
     def calculate_cost(self) -> int:
         return 2
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOpNode(ASTNode):
     """Node for binary operations (e.g., +, *, ==)."""
     left: ASTNode
     operator: str
     right: ASTNode
+    # Function implementing `operator`, or None if the operator is unknown
+    op_fn: Optional[Callable[[Any, Any], Any]] = field(default=None, init=False, repr=False, compare=False)
+    # Postfix code compiled on first non-DP evaluation (see bytecode.py)
+    _code: Optional[Tuple[Tuple[int, Any], ...]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.op_fn = BINARY_OPERATORS.get(self.operator)
 
     def calculate_cost(self) -> int:
-        left_cost = getattr(self.left, 'cost', 0)
-        right_cost = getattr(self.right, 'cost', 0)
-        op_costs = {
-            '**': 20, '*': 8, '/': 10, '%': 12, '+': 3, '-': 3,
-            '==': 4, '!=': 4, '<': 4, '>': 4, '<=': 4, '>=': 4
-        }
-        return left_cost + right_cost + op_costs.get(self.operator, 5)
-
-@dataclass
+        return self.left.cost + self.right.cost + _OP_COSTS.get(self.operator, 5)
+
+@dataclass(slots=True)
 class AssignmentNode(ASTNode):
     """Node for variable assignments."""
     variable: str
     value: ASTNode
 
     def calculate_cost(self) -> int:
-        return 5 + getattr(self.value, 'cost', 0)
+        return 5 + self.value.cost
 
-@dataclass
+@dataclass(slots=True)
 class IfNode(ASTNode):
     """Node for conditional 'if-else' statements."""
     condition: ASTNode
-    then_branch: List[ASTNode]
-    else_branch: Optional[List[ASTNode]] = None
+    then_branch: Tuple[ASTNode, ...]
+    else_branch: Optional[Tuple[ASTNode, ...]] = None
 
     def calculate_cost(self) -> int:
-        cost = 15 + getattr(self.condition, 'cost', 0)
-        cost += sum(getattr(stmt, 'cost', 0) for stmt in self.then_branch)
+        cost = 15 + self.condition.cost
+        cost += sum(stmt.cost for stmt in self.then_branch)
         if self.else_branch:
-            cost += sum(getattr(stmt, 'cost', 0) for stmt in self.else_branch)
+            cost += sum(stmt.cost for stmt in self.else_branch)
         return cost
 
-@dataclass
+@dataclass(slots=True)
 class WhileNode(ASTNode):
     """Node for 'while' loops."""
     condition: ASTNode
-    body: List[ASTNode]
+    body: Tuple[ASTNode, ...]
+    # Variables assigned anywhere in the body (see interpreter.collect_writes)
+    _body_writes: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    # Last hoisted condition and the values it was built from (see
+    # interpreter._hoisted_condition)
+    _hoisted: Optional[Tuple[Tuple[Any, ...], ASTNode]] = field(default=None, init=False, repr=False, compare=False)
 
     def calculate_cost(self) -> int:
         # Estimate loop cost (condition + body) * estimated iterations
-        condition_cost = getattr(self.condition, 'cost', 0)
-        body_cost = sum(getattr(stmt, 'cost', 0) for stmt in self.body)
+        condition_cost = self.condition.cost
+        body_cost = sum(stmt.cost for stmt in self.body)
         return (condition_cost + body_cost) * 10  # Assume 10 iterations, idk, im kinda near deadline
 
-@dataclass
+@dataclass(slots=True)
 class PrintNode(ASTNode):
     """Node for 'print' statements."""
     expression: ASTNode
 
     def calculate_cost(self) -> int:
-        return 8 + getattr(self.expression, 'cost', 0)
+        return 8 + self.expression.cost
 
-@dataclass
+@dataclass(slots=True)
 class BlockNode(ASTNode):
     """Node representing a block of statements."""
-    statements: List[ASTNode]
+    statements: Tuple[ASTNode, ...]
 
     def calculate_cost(self) -> int:
-        return sum(getattr(stmt, 'cost', 0) for stmt in self.statements)
-
+        return sum(stmt.cost for stmt in self.statements)
+
+def _child_nodes(node: ASTNode) -> Tuple[ASTNode, ...]:
+    """Return the direct child nodes whose cost `node.calculate_cost` reads."""
+    if isinstance(node, BinaryOpNode):
+        return (node.left, node.right)
+    if isinstance(node, AssignmentNode):
+        return (node.value,)
+    if isinstance(node, PrintNode):
+        return (node.expression,)
+    if isinstance(node, IfNode):
+        return (node.condition,) + node.then_branch + (node.else_branch or ())
+    if isinstance(node, WhileNode):
+        return (node.condition,) + node.body
+    if isinstance(node, BlockNode):
+        return node.statements
+    return ()
@@ -0,0 +1,77 @@
+# src/bytecode.py
+"""
+Compiles expression ASTs into a flat postfix instruction stream and runs it
+on a small stack machine. Running the stream costs one loop iteration per
+node instead of a dispatch lookup and a recursive call, which matters for
+expressions evaluated over and over inside loops.
+"""
+from typing import Any, Callable, Dict, List, Tuple
+from .ast_nodes import ASTNode, NumberNode, StringNode, VariableNode, BinaryOpNode, BINARY_OPERATORS
+
+OP_PUSH_CONST = 0   # arg: the literal value
+OP_LOAD_VAR = 1     # arg: the variable name
+OP_BINARY = 2       # arg: function applied to the two topmost values
+
+Instruction = Tuple[int, Any]
+
+def _add(left: Any, right: Any) -> Any:
+    # Allow string concatenation with '+'
+    if isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    return left + right
+
+def _unknown_operator(symbol: str) -> Callable[[Any, Any], Any]:
+    def fail(left: Any, right: Any) -> Any:
+        raise ValueError(f"Unknown operator: {symbol}")
+    return fail
+
+# Implementing function -> operator symbol, for error messages
+_SYMBOLS = {fn: symbol for symbol, fn in BINARY_OPERATORS.items()}
+_SYMBOLS[_add] = '+'
+
+def compile_expression(node: ASTNode) -> Tuple[Instruction, ...]:
+    """Lower an expression AST to postfix code: operands first, then the operator."""
+    code: List[Instruction] = []
+    _emit(node, code)
+    return tuple(code)
+
+def _emit(node: ASTNode, code: List[Instruction]):
+    if isinstance(node, (NumberNode, StringNode)):
+        code.append((OP_PUSH_CONST, node.value))
+    elif isinstance(node, VariableNode):
+        code.append((OP_LOAD_VAR, node.name))
+    elif isinstance(node, BinaryOpNode):
+        _emit(node.left, code)
+        _emit(node.right, code)
+        if node.operator == '+':
+            op_fn = _add
+        else:
+            op_fn = node.op_fn or _unknown_operator(node.operator)
+        code.append((OP_BINARY, op_fn))
+    else:
+        raise ValueError(f"Cannot evaluate non-expression node type: {type(node).__name__}")
+
+def run(code: Tuple[Instruction, ...], variables: Dict[str, Any]) -> Any:
+    """Execute compiled expression code against `variables` and return its value."""
+    stack: List[Any] = []
+    push = stack.append
+    pop = stack.pop
+    # Errors are translated once, outside the loop: a KeyError can only come
+    # from a variable load, and TypeError/ZeroDivisionError only from an
+    # operator, whose operands are still `stack[-1]` and `right`.
+    try:
+        for op, arg in code:
+            if op == OP_LOAD_VAR:
+                push(variables[arg])
+            elif op == OP_PUSH_CONST:
+                push(arg)
+            else:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+    except KeyError:
+        raise NameError(f"Variable '{arg}' is not defined.") from None
+    except TypeError:
+        raise TypeError(f"Unsupported operand types for {_SYMBOLS[arg]}: '{type(stack[-1]).__name__}' and '{type(right).__name__}'") from None
+    except ZeroDivisionError:
+        raise ZeroDivisionError("Division by zero.") from None
+    return stack[-1]
@@ -0,0 +1,26 @@
+# src/const_fold.py
+"""
+Folds constant expressions as the parser builds them. Any binary operation
+whose operands are both literals is evaluated once here instead of every
+time the interpreter reaches it.
+
+This folding is always on: it only touches pure literal arithmetic, so the
+result is exactly what the interpreter would have computed at runtime.
+"""
+from .ast_nodes import ASTNode, NumberNode, StringNode, BinaryOpNode, BINARY_OPERATORS, make_number
+
+_LITERAL_TYPES = (NumberNode, StringNode)
+
+def fold_binary(left: ASTNode, operator: str, right: ASTNode) -> ASTNode:
+    """Build `left operator right`, folded to a literal when both sides are literals."""
+    if isinstance(left, _LITERAL_TYPES) and isinstance(right, _LITERAL_TYPES):
+        op_fn = BINARY_OPERATORS.get(operator)
+        if op_fn:
+            try:
+                value = op_fn(left.value, right.value)
+            except (TypeError, ZeroDivisionError, OverflowError):
+                # Leave it for the interpreter to report at runtime
+                pass
+            else:
+                return StringNode(value) if isinstance(value, str) else make_number(value)
+    return BinaryOpNode(left, operator, right)
@@ -2,83 +2,195 @@
 Handles expression evaluation using Dynamic Programming with memoization
 to avoid re-computing results for identical subproblems.
 """
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, List, Set
 from .ast_nodes import ASTNode, NumberNode, StringNode, VariableNode, BinaryOpNode
 
+def get_read_vars(node: ASTNode) -> FrozenSet[str]:
+    """Return the set of variable names an expression reads, cached on the node."""
+    read_vars = node._read_vars
+    if read_vars is not None:
+        return read_vars
+
+    # Iterative post-order walk, filling the cache on every uncached
+    # descendant, so deep expressions cost no Python recursion
+    stack = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+        if current._read_vars is not None:
+            continue
+        if isinstance(current, BinaryOpNode):
+            if children_done:
+                current._read_vars = current.left._read_vars | current.right._read_vars
+            else:
+                stack.append((current, True))
+                stack.append((current.right, False))
+                stack.append((current.left, False))
+        elif isinstance(current, VariableNode):
+            current._read_vars = frozenset((current.name,))
+        else:
+            current._read_vars = frozenset()
+    return node._read_vars
+
 class DPExpressionEvaluator:
     """Dynamic Programming approach for expression evaluation with memoization."""
 
     def __init__(self):
-        # Memoization table for subexpression results
+        # Memoization table for subexpression results. An entry stays valid
+        # until one of the variables its expression reads is written.
         self.memo_table: Dict[str, Any] = {}
+        # Inverted index: variable name -> memo keys whose expression reads it
+        self._memo_by_var: Dict[str, Set[str]] = {}
         self.subproblem_count = 0
         self.cache_hits = 0
 
-    def get_expression_key(self, node: ASTNode, variables: Dict[str, Any]) -> str:
-        """Generate unique key for expression + variable state."""
-        var_state = frozenset(variables.items())
-        expr_repr = self._get_node_repr(node)
-        return f"{expr_repr}|{hash(var_state)}"
+        # Node type -> handler tables, so each step is one dict lookup
+        # instead of an isinstance chain
+        self._repr_dispatch = {
+            NumberNode: lambda node: f"NUM({node.value})",
+            # Hash the value to prevent overly long keys
+            StringNode: lambda node: f"STR({hash(node.value)})",
+            VariableNode: lambda node: f"VAR({node.name})",
+        }
+        # Leaves are cheaper to evaluate than to memoize, so they bypass the
+        # memo table entirely; only composite expressions are cached
+        self._leaf_dispatch = {
+            NumberNode: self._eval_literal,
+            StringNode: self._eval_literal,
+            VariableNode: self._eval_variable,
+        }
+
+    def get_expression_key(self, node: ASTNode) -> str:
+        """Generate unique key for an expression."""
+        return self._get_node_repr(node)
+
+    def invalidate(self, name: str):
+        """Drop every memoized result that depends on variable `name`."""
+        keys = self._memo_by_var.pop(name, None)
+        if keys:
+            memo_table = self.memo_table
+            for key in keys:
+                memo_table.pop(key, None)
 
     def _get_node_repr(self, node: ASTNode) -> str:
         """Get string representation of AST node for memoization key."""
-        if isinstance(node, NumberNode):
-            return f"NUM({node.value})"
-        elif isinstance(node, StringNode):
-            # Hash the value to prevent overly long keys
-            return f"STR({hash(node.value)})"
-        elif isinstance(node, VariableNode):
-            return f"VAR({node.name})"
-        elif isinstance(node, BinaryOpNode):
-            left_repr = self._get_node_repr(node.left)
-            right_repr = self._get_node_repr(node.right)
-            return f"BIN({left_repr},{node.operator},{right_repr})"
-        else:
-            return str(type(node).__name__)
+        # Nodes are never mutated after parsing, so the repr is computed once
+        # and cached on the node itself.
+        node_repr = node._repr_cache
+        if node_repr is not None:
+            return node_repr
 
-    def evaluate_with_dp(self, node: ASTNode, variables: Dict[str, Any]) -> Any:
-        """Evaluate expression using dynamic programming."""
-        key = self.get_expression_key(node, variables)
-
-        # Check if we've already computed this subproblem
-        if key in self.memo_table:
-            self.cache_hits += 1
-            return self.memo_table[key]
-
-        self.subproblem_count += 1
-
-        # Compute result
-        if isinstance(node, NumberNode):
-            result = node.value
-        elif isinstance(node, StringNode):
-            result = node.value
-        elif isinstance(node, VariableNode):
-            if node.name not in variables:
-                raise NameError(f"Variable '{node.name}' is not defined")
-            result = variables[node.name]
-        elif isinstance(node, BinaryOpNode):
-            # Recursively evaluate subexpressions (overlapping subproblems)
-            left = self.evaluate_with_dp(node.left, variables)
-            right = self.evaluate_with_dp(node.right, variables)
-            
-            op_map = {
-                '+': lambda a, b: a + b, '-': lambda a, b: a - b,
-                '*': lambda a, b: a * b, '/': lambda a, b: a / b,
-                '%': lambda a, b: a % b, '**': lambda a, b: a ** b,
-                '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
-                '<': lambda a, b: a < b, '>': lambda a, b: a > b,
-                '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b,
-            }
-            if node.operator in op_map:
-                result = op_map[node.operator](left, right)
+        # Iterative post-order walk: a binary node is revisited once both
+        # children have their repr cached, so deep expressions cost no
+        # Python recursion
+        stack = [(node, False)]
+        while stack:
+            current, children_done = stack.pop()
+            if current._repr_cache is not None:
+                continue
+            if type(current) is BinaryOpNode:
+                if children_done:
+                    current._repr_cache = ''.join((
+                        'BIN(', current.left._repr_cache, ',', current.operator,
+                        ',', current.right._repr_cache, ')'
+                    ))
+                else:
+                    stack.append((current, True))
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
             else:
-                raise ValueError(f"Unknown operator: {node.operator}")
-        else:
-            raise ValueError(f"Cannot evaluate node type: {type(node)}")
+                repr_fn = self._repr_dispatch.get(type(current))
+                # Unknown node types are keyed by identity so two different
+                # instances can never share a memo entry
+                current._repr_cache = repr_fn(current) if repr_fn else f"UNK({id(current)})"
+        return node._repr_cache
+
+    def evaluate_with_dp(self, node: ASTNode, variables: Dict[str, Any]) -> Any:
+        """
+        Evaluate expression using dynamic programming.
+
+        Callers must call `invalidate` whenever a variable in `variables` is
+        written to, so results depending on it are not reused.
+        """
+        leaf_fn = self._leaf_dispatch.get(type(node))
+        if leaf_fn is not None:
+            return leaf_fn(node, variables)
+
+        # Computing the root key caches the keys of every descendant too
+        self.get_expression_key(node)
+
+        # Iterative post-order walk, like _get_node_repr, so deep expressions
+        # cost no Python recursion. A binary node is revisited once both
+        # operand values are on `values`; leaf operands are evaluated in place
+        # rather than pushed. Operands are still evaluated left to right, and
+        # each subproblem is checked against the memo table first.
+        leaf_of = self._leaf_dispatch.get
+        memo_table = self.memo_table
+        memo_by_var = self._memo_by_var
+        values: List[Any] = []
+        push_value = values.append
+        pop_value = values.pop
+        stack = [(node, False)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            current, operands_done = pop()
+            if not operands_done:
+                leaf_fn = leaf_of(type(current))
+                if leaf_fn is not None:
+                    push_value(leaf_fn(current, variables))
+                    continue
+
+                # Check if we've already computed this subproblem
+                key = current._repr_cache
+                if key in memo_table:
+                    self.cache_hits += 1
+                    push_value(memo_table[key])
+                    continue
+
+                self.subproblem_count += 1
+                if type(current) is not BinaryOpNode:
+                    raise ValueError(f"Cannot evaluate node type: {type(current)}")
+
+                # Evaluate subexpressions (overlapping subproblems)
+                left = current.left
+                leaf_fn = leaf_of(type(left))
+                if leaf_fn is None:
+                    push((current, True))
+                    push((current.right, False))
+                    push((left, False))
+                    continue
+                push_value(leaf_fn(left, variables))
+                right = current.right
+                leaf_fn = leaf_of(type(right))
+                if leaf_fn is None:
+                    push((current, True))
+                    push((right, False))
+                    continue
+                push_value(leaf_fn(right, variables))
+
+            # Both operand values are on `values`
+            right_value = pop_value()
+            left_value = pop_value()
+            op_fn = current.op_fn
+            if op_fn is None:
+                raise ValueError(f"Unknown operator: {current.operator}")
+            result = op_fn(left_value, right_value)
+
+            # Memoize result and record which variables it depends on
+            key = current._repr_cache
+            memo_table[key] = result
+            for name in get_read_vars(current):
+                memo_by_var.setdefault(name, set()).add(key)
+            push_value(result)
+        return values[0]
+
+    def _eval_literal(self, node: ASTNode, variables: Dict[str, Any]) -> Any:
+        return node.value
 
-        # Memoize result
-        self.memo_table[key] = result
-        return result
+    def _eval_variable(self, node: VariableNode, variables: Dict[str, Any]) -> Any:
+        if node.name not in variables:
+            raise NameError(f"Variable '{node.name}' is not defined")
+        return variables[node.name]
 
     def get_stats(self) -> Dict[str, Any]:
         """Get DP statistics."""
@@ -1,31 +1,100 @@
 """
 The Interpreter, the main engine that executes the AST. It walks the tree
 and evaluates nodes, managing variable state and control flow. It can be
-configured to use a Dynamic Programming evaluator or a standard recursive one.
+configured to use a Dynamic Programming evaluator, or to run each expression
+as compiled postfix code on a small stack machine (see bytecode.py).
 """
-from typing import Dict, Any
+import sys
+from typing import Dict, Any, FrozenSet, Iterable, List, Set, Tuple
 from .ast_nodes import (
     ASTNode, NumberNode, StringNode, VariableNode, BinaryOpNode, AssignmentNode,
-    IfNode, WhileNode, PrintNode, BlockNode
+    IfNode, WhileNode, PrintNode, BlockNode, make_number
 )
-from .evaluator import DPExpressionEvaluator
+from .evaluator import DPExpressionEvaluator, get_read_vars
+from .bytecode import compile_expression, run
+
+def collect_writes(statements: Iterable[ASTNode]) -> FrozenSet[str]:
+    """Return every variable name assigned in `statements`, including nested blocks."""
+    writes: Set[str] = set()
+    pending = list(statements)
+    while pending:
+        stmt = pending.pop()
+        if isinstance(stmt, AssignmentNode):
+            writes.add(stmt.variable)
+        elif isinstance(stmt, IfNode):
+            pending.extend(stmt.then_branch)
+            if stmt.else_branch:
+                pending.extend(stmt.else_branch)
+        elif isinstance(stmt, WhileNode):
+            pending.extend(stmt.body)
+        elif isinstance(stmt, BlockNode):
+            pending.extend(stmt.statements)
+    return frozenset(writes)
+
+def _collect_invariants(node: ASTNode, writes: FrozenSet[str], invariants: List[BinaryOpNode]):
+    """Append the largest operations under `node` that read none of `writes`, left to right."""
+    if isinstance(node, BinaryOpNode):
+        if get_read_vars(node).isdisjoint(writes):
+            invariants.append(node)
+        else:
+            _collect_invariants(node.left, writes, invariants)
+            _collect_invariants(node.right, writes, invariants)
+
+def _replace_subtrees(node: ASTNode, replacements: Dict[int, ASTNode]) -> ASTNode:
+    """Return `node` with every subtree whose id is in `replacements` swapped out."""
+    replacement = replacements.get(id(node))
+    if replacement is not None:
+        return replacement
+    if not isinstance(node, BinaryOpNode):
+        return node
+    left = _replace_subtrees(node.left, replacements)
+    right = _replace_subtrees(node.right, replacements)
+    if left is node.left and right is node.right:
+        return node
+    return BinaryOpNode(left, node.operator, right)
+
+# Marks an invariant whose evaluation raised, so it stays in the condition
+_NOT_HOISTED = object()
 
 class NyundaInterpreter:
     """Executes an AST, with optional support for DP evaluation."""
 
-    def __init__(self, use_dp: bool = True):
+    def __init__(self, use_dp: bool = True, track_stats: bool = False):
         """
         Initializes the interpreter.
 
         Args:
             use_dp: If True, uses the memoized DP evaluator. 
-                    If False, uses a standard recursive evaluator.
+                    If False, runs expressions as compiled postfix code.
+            track_stats: If True, counts executed nodes in `execution_count`.
+                         Off by default to keep the dispatch path minimal.
         """
         self.variables: Dict[str, Any] = {}
         self.use_dp = use_dp
         self.dp_evaluator = DPExpressionEvaluator() if self.use_dp else None
+        self.track_stats = track_stats
         self.execution_count = 0
 
+        # Node type -> bound executor, built once so dispatch is a single dict lookup
+        self._dispatch = {
+            NumberNode: self.execute_NumberNode,
+            StringNode: self.execute_StringNode,
+            VariableNode: self.execute_VariableNode,
+            BinaryOpNode: self.execute_BinaryOpNode,
+            AssignmentNode: self.execute_AssignmentNode,
+            IfNode: self.execute_IfNode,
+            WhileNode: self.execute_WhileNode,
+            PrintNode: self.execute_PrintNode,
+            BlockNode: self.execute_BlockNode,
+        }
+        # Expression node type -> evaluator used by _evaluate_recursively
+        self._eval_dispatch = {
+            NumberNode: self._eval_literal,
+            StringNode: self._eval_literal,
+            VariableNode: self._eval_variable,
+            BinaryOpNode: self._eval_binary,
+        }
+
     def interpret(self, ast: ASTNode) -> Any:
         """Interpret Nyunda code from an AST, handling runtime errors."""
         try:
@@ -41,46 +110,39 @@ class NyundaInterpreter:
         return self._evaluate_recursively(node)
 
     def _evaluate_recursively(self, node: ASTNode) -> Any:
-        """A simple, non-memoized recursive evaluator as a fallback."""
-        if isinstance(node, NumberNode):
-            return node.value
-        elif isinstance(node, StringNode):
-            return node.value
-        elif isinstance(node, VariableNode):
-            if node.name not in self.variables:
-                raise NameError(f"Variable '{node.name}' is not defined.")
-            return self.variables[node.name]
-        elif isinstance(node, BinaryOpNode):
-            left = self._evaluate_recursively(node.left)
-            right = self._evaluate_recursively(node.right)
-            op_map = {
-                '+': lambda a, b: a + b, '-': lambda a, b: a - b,
-                '*': lambda a, b: a * b, '/': lambda a, b: a / b,
-                '%': lambda a, b: a % b, '**': lambda a, b: a ** b,
-                '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
-                '<': lambda a, b: a < b, '>': lambda a, b: a > b,
-                '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b,
-            }
-            if node.operator in op_map:
-                try:
-                    # Allow string concatenation with '+'
-                    if node.operator == '+' and (isinstance(left, str) or isinstance(right, str)):
-                        return str(left) + str(right)
-                    return op_map[node.operator](left, right)
-                except TypeError:
-                    raise TypeError(f"Unsupported operand types for {node.operator}: '{type(left).__name__}' and '{type(right).__name__}'")
-                except ZeroDivisionError:
-                    raise ZeroDivisionError("Division by zero.")
-            else:
-                raise ValueError(f"Unknown operator: {node.operator}")
-        else:
+        """
+        Non-memoized evaluator used when DP is off. Leaves are read directly;
+        operations run as compiled postfix code via bytecode.run.
+        """
+        eval_fn = self._eval_dispatch.get(type(node))
+        if eval_fn is None:
             raise ValueError(f"Cannot evaluate non-expression node type: {type(node).__name__}")
+        return eval_fn(node)
+
+    def _eval_literal(self, node: ASTNode) -> Any:
+        return node.value
+
+    def _eval_variable(self, node: VariableNode) -> Any:
+        if node.name not in self.variables:
+            raise NameError(f"Variable '{node.name}' is not defined.")
+        return self.variables[node.name]
+
+    def _eval_binary(self, node: BinaryOpNode) -> Any:
+        # The whole operation tree runs as flat postfix code, compiled once
+        # per node, instead of recursing through the dispatch table
+        code = node._code
+        if code is None:
+            code = node._code = compile_expression(node)
+        return run(code, self.variables)
 
     def execute(self, node: ASTNode) -> Any:
         """Execute an AST node by dispatching to the correct method."""
-        self.execution_count += 1
-        method_name = f'execute_{type(node).__name__}'
-        executor = getattr(self, method_name, self.generic_executor)
+        if self.track_stats:
+            self.execution_count += 1
+        try:
+            executor = self._dispatch[type(node)]
+        except KeyError:
+            return self.generic_executor(node)
         return executor(node)
 
     def execute_NumberNode(self, node: NumberNode) -> Any:
@@ -98,36 +160,100 @@ class NyundaInterpreter:
     def execute_AssignmentNode(self, node: AssignmentNode) -> Any:
         value = self.evaluate_expression(node.value)
         self.variables[node.variable] = value
+        if self.dp_evaluator:
+            self.dp_evaluator.invalidate(node.variable)
         return value
 
     def execute_IfNode(self, node: IfNode) -> Any:
         condition = self.evaluate_expression(node.condition)
-        result = None
         if condition:
-            for stmt in node.then_branch:
-                result = self.execute(stmt)
+            return self._execute_statements(node.then_branch)
         elif node.else_branch:
-            for stmt in node.else_branch:
-                result = self.execute(stmt)
-        return result
+            return self._execute_statements(node.else_branch)
+        return None
 
     def execute_WhileNode(self, node: WhileNode) -> Any:
+        writes = node._body_writes
+        if writes is None:
+            writes = node._body_writes = collect_writes(node.body)
+
+        # Hot loop: bind everything the loop touches to locals once up front,
+        # and pick a loop shape for the body size so short bodies skip the
+        # per-iteration iterator
+        evaluate = self.evaluate_expression
+        execute = self.execute
+        condition = self._hoisted_condition(node, writes)
+        body = node.body
+        result = None
+        if len(body) == 1:
+            stmt = body[0]
+            while evaluate(condition):
+                result = execute(stmt)
+        elif len(body) == 2:
+            first, second = body
+            while evaluate(condition):
+                execute(first)
+                result = execute(second)
+        else:
+            while evaluate(condition):
+                for stmt in body:
+                    result = execute(stmt)
+        return result
+
+    def _execute_statements(self, statements: Tuple[ASTNode, ...]) -> Any:
+        """Execute statements in order and return the last result."""
+        if len(statements) == 1:
+            return self.execute(statements[0])
         result = None
-        while self.evaluate_expression(node.condition):
-            for stmt in node.body:
-                result = self.execute(stmt)
+        for stmt in statements:
+            result = self.execute(stmt)
         return result
 
+    def _hoisted_condition(self, node: WhileNode, writes: FrozenSet[str]) -> ASTNode:
+        """
+        Return the loop condition with every subexpression that reads none of
+        the variables in `writes` replaced by a literal holding its current
+        value, so it is evaluated once per loop instead of once per iteration.
+
+        The rewritten condition is kept on the node and reused on the next
+        entry when the hoisted values are unchanged, so it keeps its compiled
+        code and caches instead of being rebuilt every time the loop starts.
+        """
+        invariants: List[BinaryOpNode] = []
+        _collect_invariants(node.condition, writes, invariants)
+        if not invariants:
+            return node.condition
+
+        values = []
+        for subtree in invariants:
+            try:
+                values.append(self.evaluate_expression(subtree))
+            except Exception:
+                # Leave it in place so the error surfaces in evaluation order
+                values.append(_NOT_HOISTED)
+        # Compare by type and repr so 1.0/True and 0.0/-0.0 stay distinct
+        key = tuple(None if value is _NOT_HOISTED else (type(value), repr(value)) for value in values)
+        hoisted = node._hoisted
+        if hoisted is not None and hoisted[0] == key:
+            return hoisted[1]
+
+        replacements = {
+            id(subtree): StringNode(value) if isinstance(value, str) else make_number(value)
+            for subtree, value in zip(invariants, values) if value is not _NOT_HOISTED
+        }
+        condition = _replace_subtrees(node.condition, replacements)
+        node._hoisted = (key, condition)
+        return condition
+
     def execute_PrintNode(self, node: PrintNode) -> Any:
         value = self.evaluate_expression(node.expression)
-        print(value)
+        # One write call per statement. sys.stdout is looked up on every call
+        # so output follows redirection, as print() did.
+        sys.stdout.write(f"{value}\n")
         return value
 
     def execute_BlockNode(self, node: BlockNode) -> Any:
-        result = None
-        for stmt in node.statements:
-            result = self.execute(stmt)
-        return result
+        return self._execute_statements(node.statements)
 
     def generic_executor(self, node: ASTNode):
         """Fallback for unhandled node types."""
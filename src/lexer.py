@@ -3,9 +3,20 @@ The Lexer, responsible for breaking the source code into a stream of tokens.
 It uses regex for pattern matching and handles Sundanese keywords.
 """
 import re
+import sys
 from typing import List
 from .token import Token
 
+# Token types whose value is an operator symbol. Their values are interned so
+# operator-keyed table lookups downstream hit the identity fast path.
+_OPERATOR_TYPES = frozenset((
+    'POWER', 'EQ', 'NEQ', 'LTE', 'GTE', 'PLUS', 'MINUS',
+    'MULTIPLY', 'DIVIDE', 'MODULO', 'LT', 'GT',
+))
+
+# Token types that are matched but never emitted
+_SKIP_TYPES = frozenset(('WHITESPACE', 'COMMENT'))
+
 class NyundaLexer:
     """Regex-based lexer with Sunda language keywords."""
 
@@ -28,7 +39,7 @@ class NyundaLexer:
         # Token patterns (order matters for precedence)
         self.token_patterns = [
             ('NUMBER', r'\d+(\.\d+)?'),
-            ('STRING', r'"[^"]*"'),
+            ('STRING', r'"[^"\n]*"'),  # strings never span lines
             ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_]*'),
             ('POWER', r'\*\*'),
             ('EQ', r'=='),
@@ -53,43 +64,55 @@ class NyundaLexer:
             ('COMMENT', r'#[^\n]*'),
         ]
 
-        # Compile regex patterns for efficiency
-        self.compiled_patterns = [
-            (name, re.compile(pattern)) for name, pattern in self.token_patterns
-        ]
+        # Fuse every pattern into a single alternation so the regex engine does
+        # the dispatch. Alternatives are tried in order, which keeps the
+        # precedence of the list above. The trailing MISMATCH group catches any
+        # character no other pattern accepts.
+        self._master_re = re.compile('|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern in self.token_patterns
+        ) + r'|(?P<MISMATCH>.)')
 
     def tokenize(self, text: str) -> List[Token]:
-        """Tokenize input text using regex patterns."""
+        """
+        Tokenize input text in a single pass of the fused regex.
+
+        Whitespace, comments and newlines are consumed but never emitted, and
+        the list always ends with an EOF token, so the parser can use it
+        directly.
+        """
         tokens = []
-        lines = text.split('\n')
+        keywords = self.sunda_keywords
+        line_num = 1
+        line_start = 0  # offset of the first character of the current line
 
-        for line_num, line in enumerate(lines, 1):
-            column = 1
-            pos = 0
+        for match in self._master_re.finditer(text):
+            token_type = match.lastgroup
 
-            while pos < len(line):
-                matched = False
-                for token_type, pattern in self.compiled_patterns:
-                    match = pattern.match(line, pos)
-                    if match:
-                        value = match.group(0)
+            # Track line positions; newlines themselves are not emitted
+            if token_type == 'NEWLINE':
+                line_num += 1
+                line_start = match.end()
+                continue
 
-                        # Skip whitespace and comments
-                        if token_type not in ['WHITESPACE', 'COMMENT']:
-                            # Translate Sunda keywords
-                            if token_type == 'IDENTIFIER' and value in self.sunda_keywords:
-                                value = self.sunda_keywords[value]
-                                token_type = 'KEYWORD'
-                            
-                            tokens.append(Token(token_type, value, line_num, column))
+            # Skip whitespace and comments
+            if token_type in _SKIP_TYPES:
+                continue
 
-                        pos = match.end()
-                        column += len(value)
-                        matched = True
-                        break
+            value = match.group()
+            column = match.start() - line_start + 1
+            if token_type == 'MISMATCH':
+                raise SyntaxError(f"Invalid character '{value}' at line {line_num}, column {column}")
 
-                if not matched:
-                    raise SyntaxError(f"Invalid character '{line[pos]}' at line {line_num}, column {column}")
-        
-        return tokens
+            # Translate Sunda keywords
+            if token_type == 'IDENTIFIER':
+                translated = keywords.get(value)
+                if translated is not None:
+                    value = translated
+                    token_type = 'KEYWORD'
+            elif token_type in _OPERATOR_TYPES:
+                value = sys.intern(value)
+
+            tokens.append(Token(token_type, value, line_num, column))
 
+        tokens.append(Token('EOF', '', line_num, len(text) - line_start + 1))
+        return tokens
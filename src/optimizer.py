@@ -1,146 +1,297 @@
 # src/optimizer.py
 """
-Applies compile-time optimizations to the AST using a Greedy Best-First
-Search algorithm. This helps simplify expressions and reduce execution cost.
+Applies compile-time optimizations to the AST with a greedy bottom-up
+rewrite. This helps simplify expressions and reduce execution cost.
 """
-import heapq
-from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Tuple, Set
-from copy import deepcopy
-from .ast_nodes import ASTNode, BinaryOpNode, NumberNode, BlockNode, IfNode, WhileNode, AssignmentNode, PrintNode
-
-@dataclass(frozen=True, eq=False) # Use frozen, but define custom eq/hash based on string
-class OptimizationState:
-    """State for best-first search optimization."""
-    ast: ASTNode
-    cost: int
-    depth: int
-    transformations: Tuple[str, ...]
-
-    def __lt__(self, other):
-        if self.cost == other.cost:
-            return self.depth < other.depth
-        return self.cost < other.cost
-
-    def __eq__(self, other):
-        return isinstance(other, OptimizationState) and str(self.ast) == str(other.ast)
-
-    def __hash__(self):
-        return hash(str(self.ast))
+from typing import Dict, FrozenSet, List, Any, Optional, Set, Tuple
+from .ast_nodes import (
+    ASTNode, BinaryOpNode, NumberNode, VariableNode, BlockNode, IfNode, WhileNode,
+    AssignmentNode, PrintNode, BINARY_OPERATORS, ZERO, make_number
+)
+
+# Operators folded when both operands are numeric literals; the functions
+# come from the shared table so folding matches runtime evaluation
+_BINOP_FOLD = {op: BINARY_OPERATORS[op] for op in ('+', '-', '*', '/', '**')}
+
+# Operators whose result is a number whenever both operands are numbers
+_ARITHMETIC_OPERATORS = frozenset(('+', '-', '*', '/', '%', '**'))
+
+# Operators that cannot raise when both operands are numbers
+_NON_FAILING_OPERATORS = frozenset(('+', '-', '*'))
+
+# Algebraic identities keyed by (operator, side of the literal, literal value).
+# They only hold for numbers ('+' also concatenates strings, '*' repeats
+# them), so they are applied only when the other operand is numeric.
+_ALGEBRAIC_RULES = {
+    ('+', 'R', 0): lambda node: (node.left, "identity_add"),
+    ('+', 'L', 0): lambda node: (node.right, "identity_add"),
+    ('*', 'R', 1): lambda node: (node.left, "identity_mul"),
+    ('*', 'L', 1): lambda node: (node.right, "identity_mul"),
+    ('*', 'R', 0): lambda node: (ZERO, "mul_by_zero"),
+    ('*', 'L', 0): lambda node: (ZERO, "mul_by_zero"),
+}
+
+# Identities that drop the other operand without evaluating it, so they also
+# need that operand to be unable to raise (see _cannot_fail)
+_DISCARDING_RULES = frozenset((('*', 'R', 0), ('*', 'L', 0)))
+
+def _has_foldable_pattern(ast: ASTNode) -> bool:
+    """Return True if any binary operation in `ast` matches one of the rewrite rules."""
+    pending = [ast]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, BinaryOpNode):
+            left, op, right = node.left, node.operator, node.right
+            left_is_number = isinstance(left, NumberNode)
+            right_is_number = isinstance(right, NumberNode)
+            if left_is_number and right_is_number and op in _BINOP_FOLD:
+                return True
+            if right_is_number and ((op, 'R', right.value) in _ALGEBRAIC_RULES
+                                    or (op == '**' and right.value == 2)):
+                return True
+            if left_is_number and (op, 'L', left.value) in _ALGEBRAIC_RULES:
+                return True
+            pending.append(left)
+            pending.append(right)
+        elif isinstance(node, AssignmentNode):
+            pending.append(node.value)
+        elif isinstance(node, PrintNode):
+            pending.append(node.expression)
+        elif isinstance(node, IfNode):
+            pending.append(node.condition)
+            pending.extend(node.then_branch)
+            if node.else_branch:
+                pending.extend(node.else_branch)
+        elif isinstance(node, WhileNode):
+            pending.append(node.condition)
+            pending.extend(node.body)
+        elif isinstance(node, BlockNode):
+            pending.extend(node.statements)
+    return False
+
+def _is_numeric(node: ASTNode, numeric_vars: FrozenSet[str]) -> bool:
+    """Return True if `node` can only evaluate to a number (not a string or bool)."""
+    if isinstance(node, NumberNode):
+        # Folded comparisons are stored as NumberNode(True/False)
+        return type(node.value) is not bool
+    if isinstance(node, VariableNode):
+        return node.name in numeric_vars
+    if isinstance(node, BinaryOpNode):
+        return (node.operator in _ARITHMETIC_OPERATORS
+                and _is_numeric(node.left, numeric_vars)
+                and _is_numeric(node.right, numeric_vars))
+    return False
+
+def _cannot_fail(node: ASTNode, numeric_vars: FrozenSet[str], defined: Set[str]) -> bool:
+    """
+    Return True if evaluating `node` can raise no error: it only combines
+    numbers and numeric variables already assigned (`defined`) with operators
+    that cannot fail on numbers.
+    """
+    if isinstance(node, NumberNode):
+        return True
+    if isinstance(node, VariableNode):
+        return node.name in numeric_vars and node.name in defined
+    if isinstance(node, BinaryOpNode):
+        return (node.operator in _NON_FAILING_OPERATORS
+                and _cannot_fail(node.left, numeric_vars, defined)
+                and _cannot_fail(node.right, numeric_vars, defined))
+    return False
+
+def _numeric_variables(ast: ASTNode) -> FrozenSet[str]:
+    """
+    Return the variables that only ever hold numbers, i.e. every assignment to
+    them anywhere in the program stores a numeric expression. Starts from all
+    assigned variables and drops any with a non-numeric assignment until
+    nothing changes.
+    """
+    assignments: List[AssignmentNode] = []
+    pending = [ast]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, AssignmentNode):
+            assignments.append(node)
+        elif isinstance(node, IfNode):
+            pending.extend(node.then_branch)
+            if node.else_branch:
+                pending.extend(node.else_branch)
+        elif isinstance(node, WhileNode):
+            pending.extend(node.body)
+        elif isinstance(node, BlockNode):
+            pending.extend(node.statements)
+
+    numeric: Set[str] = {assignment.variable for assignment in assignments}
+    changed = True
+    while changed:
+        numeric_vars = frozenset(numeric)
+        non_numeric = {assignment.variable for assignment in assignments
+                       if assignment.variable in numeric
+                       and not _is_numeric(assignment.value, numeric_vars)}
+        numeric -= non_numeric
+        changed = bool(non_numeric)
+    return frozenset(numeric)
 
 class GreedyBestFirstOptimizer:
-    """Greedy Best-First Search for AST optimization."""
+    """
+    Greedy AST optimizer.
+
+    Each node is simplified after its children, bottom-up, in a single pass.
+    A rewrite is applied only when it lowers the node's cost, and the first
+    such rule wins.
+    """
 
-    def __init__(self, max_depth: int = 5):
-        self.max_depth = max_depth
-        self.states_explored = 0
+    def __init__(self, track_transformations: bool = False):
+        """
+        Initializes the optimizer.
+
+        Args:
+            track_transformations: If True, `optimize` also returns the name of
+                                   every rewrite applied, in order. Off by
+                                   default; `get_stats` still counts them.
+        """
+        self.track_transformations = track_transformations
+        self.nodes_visited = 0
         self.transformations_applied = 0
+        # Variables known to hold only numbers, set per `optimize` call
+        self._numeric_vars: FrozenSet[str] = frozenset()
+        # Variables certainly assigned at the point `_simplify` has reached,
+        # tracked in execution order during each `optimize` call
+        self._defined: Set[str] = set()
+        self._rules = [
+            self._try_constant_folding,
+            self._try_algebraic_simplification,
+            self._try_strength_reduction,
+        ]
 
     def optimize(self, ast: ASTNode) -> Tuple[ASTNode, List[str]]:
-        """Apply greedy best-first search optimization."""
-        initial_cost = ast.cost
-        initial_state = OptimizationState(ast, initial_cost, 0, tuple())
-        
-        priority_queue = [initial_state]
-        visited_states: Set[str] = {str(initial_state.ast)}
-        best_state = initial_state
-
-        while priority_queue:
-            current_state = heapq.heappop(priority_queue)
-            self.states_explored += 1
-
-            if current_state.cost < best_state.cost:
-                best_state = current_state
-            
-            if current_state.depth >= self.max_depth:
-                continue
-            
-            for new_ast, transform_name in self._get_transformed_asts(current_state.ast):
-                new_cost = new_ast.cost
-                state_signature = str(new_ast)
-
-                if state_signature not in visited_states:
-                    if new_cost < current_state.cost: # Only consider profitable transformations
-                        self.transformations_applied += 1
-                        new_transformations = current_state.transformations + (transform_name,)
-                        new_state = OptimizationState(new_ast, new_cost, current_state.depth + 1, new_transformations)
-                        heapq.heappush(priority_queue, new_state)
-                        visited_states.add(state_signature)
-        
-        return best_state.ast, list(best_state.transformations)
-
-    def _get_transformed_asts(self, node: ASTNode):
         """
-        A generator that recursively yields all possible single-transformation
-        versions of the given AST node.
+        Simplify the AST bottom-up until no profitable rule applies. The
+        returned list of rewrite names is empty unless tracking is enabled.
         """
-        # yield transformations from children (post-order traversal)
+        transformations: List[str] = []
+        # Every rewrite needs a matching pattern somewhere in the input, so
+        # a tree without one can be returned without the full pass.
+        if not _has_foldable_pattern(ast):
+            return ast, transformations
+        self._numeric_vars = _numeric_variables(ast)
+        self._defined = set()
+        return self._simplify(ast, transformations if self.track_transformations else None), transformations
+
+    def _simplify(self, node: ASTNode, transformations: Optional[List[str]]) -> ASTNode:
+        """Simplify the children of `node`, then rewrite `node` itself to a fixpoint."""
+        self.nodes_visited += 1
+
+        # Rebuild the node around its simplified children (post-order). A
+        # node is only rebuilt when a child actually changed, so untouched
+        # subtrees keep their identity and cached cost.
         if isinstance(node, BlockNode):
-            for i, stmt in enumerate(node.statements):
-                for transformed_stmt, name in self._get_transformed_asts(stmt):
-                    new_statements = node.statements[:]
-                    new_statements[i] = transformed_stmt
-                    yield BlockNode(new_statements), name
+            statements = self._simplify_statements(node.statements, transformations)
+            if statements is not node.statements:
+                node = BlockNode(statements)
         elif isinstance(node, AssignmentNode):
-            for new_value, name in self._get_transformed_asts(node.value):
-                yield AssignmentNode(node.variable, new_value), name
+            value = self._simplify(node.value, transformations)
+            if value is not node.value:
+                node = AssignmentNode(node.variable, value)
+            self._defined.add(node.variable)
         elif isinstance(node, PrintNode):
-            for new_expr, name in self._get_transformed_asts(node.expression):
-                yield PrintNode(new_expr), name
+            expression = self._simplify(node.expression, transformations)
+            if expression is not node.expression:
+                node = PrintNode(expression)
         elif isinstance(node, BinaryOpNode):
-            for new_left, name in self._get_transformed_asts(node.left):
-                yield BinaryOpNode(new_left, node.operator, node.right), name
-            for new_right, name in self._get_transformed_asts(node.right):
-                yield BinaryOpNode(node.left, node.operator, new_right), name
+            left = self._simplify(node.left, transformations)
+            right = self._simplify(node.right, transformations)
+            if left is not node.left or right is not node.right:
+                node = BinaryOpNode(left, node.operator, right)
         elif isinstance(node, IfNode):
-             for new_cond, name in self._get_transformed_asts(node.condition):
-                yield IfNode(new_cond, node.then_branch, node.else_branch), name
+            condition = self._simplify(node.condition, transformations)
+            # Only variables assigned on both branches are certain afterwards
+            defined = self._defined
+            self._defined = set(defined)
+            then_branch = self._simplify_statements(node.then_branch, transformations)
+            then_defined = self._defined
+            self._defined = set(defined)
+            else_branch = node.else_branch
+            if else_branch:
+                else_branch = self._simplify_statements(else_branch, transformations)
+                defined |= then_defined & self._defined
+            self._defined = defined
+            if (condition is not node.condition or then_branch is not node.then_branch
+                    or else_branch is not node.else_branch):
+                node = IfNode(condition, then_branch, else_branch)
         elif isinstance(node, WhileNode):
-            for new_cond, name in self._get_transformed_asts(node.condition):
-                yield WhileNode(new_cond, node.body), name
+            condition = self._simplify(node.condition, transformations)
+            # The body may never run, so its assignments are not certain afterwards
+            defined = self._defined
+            self._defined = set(defined)
+            body = self._simplify_statements(node.body, transformations)
+            self._defined = defined
+            if condition is not node.condition or body is not node.body:
+                node = WhileNode(condition, body)
 
-        # yield transformations for the node itself
-        transformation_rules = [
-            self._try_constant_folding,
-            self._try_algebraic_simplification,
-            self._try_strength_reduction,
-        ]
-        for rule in transformation_rules:
-            transformed_node, name = rule(node)
-            if transformed_node:
-                yield transformed_node, name
-
-    def _try_constant_folding(self, node: ASTNode) -> Tuple[Optional[ASTNode], str]:
-        if isinstance(node, BinaryOpNode) and isinstance(node.left, NumberNode) and isinstance(node.right, NumberNode):
-            try:
-                op_map = {'+': float.__add__, '-': float.__sub__, '*': float.__mul__, '/': float.__truediv__, '**': float.__pow__}
-                if node.operator in op_map:
-                    result = op_map[node.operator](node.left.value, node.right.value)
-                    return NumberNode(result), "constant_folding"
-            except ZeroDivisionError:
-                return None, ""
+        # Apply profitable rules to the node itself until none fires. Every
+        # rule rewrites a binary operation, so stop once the node is not one.
+        while isinstance(node, BinaryOpNode):
+            for rule in self._rules:
+                transformed_node, name = rule(node)
+                if transformed_node and transformed_node.cost < node.cost:
+                    self.transformations_applied += 1
+                    if transformations is not None:
+                        transformations.append(name)
+                    node = transformed_node
+                    break
+            else:
+                break
+        return node
+
+    def _simplify_statements(self, statements: Tuple[ASTNode, ...], transformations: Optional[List[str]]) -> Tuple[ASTNode, ...]:
+        """Simplify each statement, returning `statements` itself if none changed."""
+        simplified = tuple(self._simplify(stmt, transformations) for stmt in statements)
+        if all(new is old for new, old in zip(simplified, statements)):
+            return statements
+        return simplified
+
+    def _try_constant_folding(self, node: BinaryOpNode) -> Tuple[Optional[ASTNode], str]:
+        if isinstance(node.left, NumberNode) and isinstance(node.right, NumberNode):
+            fold_fn = _BINOP_FOLD.get(node.operator)
+            if fold_fn:
+                try:
+                    return make_number(fold_fn(node.left.value, node.right.value)), "constant_folding"
+                except (ZeroDivisionError, OverflowError):
+                    # Leave it for the interpreter to report at runtime
+                    return None, ""
         return None, ""
 
-    def _try_algebraic_simplification(self, node: ASTNode) -> Tuple[Optional[ASTNode], str]:
-        if isinstance(node, BinaryOpNode):
-            if node.operator == '+' and isinstance(node.right, NumberNode) and node.right.value == 0: return node.left, "identity_add"
-            if node.operator == '+' and isinstance(node.left, NumberNode) and node.left.value == 0: return node.right, "identity_add"
-            if node.operator == '*' and isinstance(node.right, NumberNode) and node.right.value == 1: return node.left, "identity_mul"
-            if node.operator == '*' and isinstance(node.left, NumberNode) and node.left.value == 1: return node.right, "identity_mul"
-            if node.operator == '*' and isinstance(node.right, NumberNode) and node.right.value == 0: return NumberNode(0), "mul_by_zero"
-            if node.operator == '*' and isinstance(node.left, NumberNode) and node.left.value == 0: return NumberNode(0), "mul_by_zero"
+    def _try_algebraic_simplification(self, node: BinaryOpNode) -> Tuple[Optional[ASTNode], str]:
+        if isinstance(node.right, NumberNode):
+            key = (node.operator, 'R', node.right.value)
+            rule = _ALGEBRAIC_RULES.get(key)
+            if rule and self._can_simplify(key, node.left):
+                return rule(node)
+        if isinstance(node.left, NumberNode):
+            key = (node.operator, 'L', node.left.value)
+            rule = _ALGEBRAIC_RULES.get(key)
+            if rule and self._can_simplify(key, node.right):
+                return rule(node)
         return None, ""
 
-    def _try_strength_reduction(self, node: ASTNode) -> Tuple[Optional[ASTNode], str]:
-        if isinstance(node, BinaryOpNode):
-            if node.operator == '**' and isinstance(node.right, NumberNode) and node.right.value == 2:
-                # USe deepcopy to ensure the nodes are distinct objects if needed later
-                return BinaryOpNode(deepcopy(node.left), '*', deepcopy(node.left)), "strength_reduction_pow2"
+    def _can_simplify(self, key: Tuple[str, str, Any], operand: ASTNode) -> bool:
+        """Check that the identity `key` holds for the non-literal `operand`."""
+        if key in _DISCARDING_RULES:
+            return _cannot_fail(operand, self._numeric_vars, self._defined)
+        return _is_numeric(operand, self._numeric_vars)
+
+    def _try_strength_reduction(self, node: BinaryOpNode) -> Tuple[Optional[ASTNode], str]:
+        if (node.operator == '**' and isinstance(node.right, NumberNode) and node.right.value == 2
+                and _is_numeric(node.left, self._numeric_vars)):
+            # Nodes are never mutated, so both operands can share the base subtree.
+            # Float overflow is not preserved: x ** 2 raises OverflowError where
+            # x * x gives inf (documented in the README).
+            return BinaryOpNode(node.left, '*', node.left), "strength_reduction_pow2"
         return None, ""
 
     def get_stats(self) -> Dict[str, Any]:
         return {
-            'states_explored': self.states_explored,
+            'nodes_visited': self.nodes_visited,
             'transformations_applied': self.transformations_applied
         }
 
@@ -1,14 +1,27 @@
 # src/parser.py
 """
 The Parser, which consumes tokens from the Lexer and builds an AST.
-It uses recursive descent and handles operator precedence.
+It uses recursive descent for statements and precedence climbing for
+expressions.
 """
-from typing import List, Optional
+from typing import Dict, List, Tuple
 from .token import Token
 from .ast_nodes import (
-    ASTNode, BlockNode, NumberNode, VariableNode, BinaryOpNode,
-    AssignmentNode, IfNode, WhileNode, PrintNode, StringNode
+    ASTNode, BlockNode, VariableNode, AssignmentNode, IfNode,
+    WhileNode, PrintNode, StringNode, make_number
 )
+from .const_fold import fold_binary
+
+# Binary operator token type -> precedence level (higher binds tighter)
+_PRECEDENCE = {
+    'EQ': 1, 'NEQ': 1, 'LT': 1, 'GT': 1, 'LTE': 1, 'GTE': 1,
+    'PLUS': 2, 'MINUS': 2,
+    'MULTIPLY': 3, 'DIVIDE': 3, 'MODULO': 3,
+    'POWER': 4,
+}
+
+# Terminates token lists that do not come from the lexer
+_EOF = Token('EOF', '', 0, 0)
 
 class NyundaParser:
     """Parser that builds an Abstract Syntax Tree (AST) from tokens."""
@@ -16,23 +29,46 @@ class NyundaParser:
     def __init__(self):
         self.tokens: List[Token] = []
         self.pos = 0
+        # Variable name -> shared node; nodes are immutable, so every
+        # reference to a name can use the same instance
+        self._var_cache: Dict[str, VariableNode] = {}
+
+        # Statement keyword -> parser method
+        self._keyword_dispatch = {
+            'if': self.parse_if,
+            'while': self.parse_while,
+            'print': self.parse_print,
+        }
+        # Primary token type -> node builder
+        self._primary_dispatch = {
+            'NUMBER': lambda token: make_number(float(token.value)),
+            # The token value includes quotes, so we strip them.
+            'STRING': lambda token: StringNode(token.value[1:-1]),
+            'IDENTIFIER': self._variable_node,
+        }
 
     def parse(self, tokens: List[Token]) -> ASTNode:
         """Parse tokens into an AST."""
-        self.tokens = [t for t in tokens if t.type != 'NEWLINE']
+        # The lexer never emits NEWLINE tokens and always ends the list with
+        # an EOF token, so the stream is used as-is. The EOF sentinel makes
+        # every peek at pos or pos + 1 a plain index: consume() never moves
+        # past it, and the pos + 1 peek only happens on a real token.
+        if not tokens or tokens[-1].type != 'EOF':
+            tokens = tokens + [_EOF]
+        self.tokens = tokens
         self.pos = 0
         return self.parse_program()
 
-    def current_token(self) -> Optional[Token]:
-        """Get current token without consuming it."""
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+    def current_token(self) -> Token:
+        """Get current token without consuming it (EOF at the end)."""
+        return self.tokens[self.pos]
 
     def consume(self, expected_type: str = None) -> Token:
         """Consume and return current token, with optional type validation."""
-        if self.pos >= len(self.tokens):
+        token = self.tokens[self.pos]
+        if token.type == 'EOF':
             raise SyntaxError("Unexpected end of input")
         
-        token = self.tokens[self.pos]
         if expected_type and token.type != expected_type:
             raise SyntaxError(f"Expected {expected_type} but got {token.type} '{token.value}'")
         
@@ -42,34 +78,31 @@ class NyundaParser:
     def parse_program(self) -> BlockNode:
         """Parse an entire program into a block of statements."""
         statements = []
-        while self.current_token():
+        while self.current_token().type != 'EOF':
             statements.append(self.parse_statement())
-        return BlockNode(statements)
+        return BlockNode(tuple(statements))
 
-    def parse_block(self) -> List[ASTNode]:
+    def parse_block(self) -> Tuple[ASTNode, ...]:
         """Parse a block of code enclosed in braces."""
         self.consume('LBRACE')
         statements = []
-        while self.current_token() and self.current_token().type != 'RBRACE':
+        while self.current_token().type not in ('RBRACE', 'EOF'):
             statements.append(self.parse_statement())
         self.consume('RBRACE')
-        return statements
+        return tuple(statements)
 
     def parse_statement(self) -> ASTNode:
         """Parse a single statement."""
         token = self.current_token()
-        if not token:
+        if token.type == 'EOF':
             raise SyntaxError("Expected statement but found end of file.")
         
         if token.type == 'KEYWORD':
-            if token.value == 'if':
-                return self.parse_if()
-            elif token.value == 'while':
-                return self.parse_while()
-            elif token.value == 'print':
-                return self.parse_print()
+            handler = self._keyword_dispatch.get(token.value)
+            if handler:
+                return handler()
         elif token.type == 'IDENTIFIER':
-            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'ASSIGN':
+            if self.tokens[self.pos + 1].type == 'ASSIGN':
                 return self.parse_assignment()
         
         # If it's not a known statement, it must be a standalone expression
@@ -81,7 +114,8 @@ class NyundaParser:
         condition = self.parse_expression()
         then_branch = self.parse_block()
         else_branch = None
-        if self.current_token() and self.current_token().type == 'KEYWORD' and self.current_token().value == 'else':
+        token = self.current_token()
+        if token.type == 'KEYWORD' and token.value == 'else':
             self.consume('KEYWORD') # consume 'else'
             else_branch = self.parse_block()
         return IfNode(condition, then_branch, else_branch)
@@ -108,46 +142,40 @@ class NyundaParser:
         value = self.parse_expression()
         return AssignmentNode(var_name, value)
 
-    def parse_expression(self) -> ASTNode:
-        """Parse an expression (entry point for expression parsing)."""
-        return self.parse_comparison()
-
-    def _parse_binary_op(self, parse_next_level, op_types) -> ASTNode:
-        """Generic helper for parsing binary operations with precedence."""
-        left = parse_next_level()
-        while self.current_token() and self.current_token().type in op_types:
-            op = self.consume().value
-            right = parse_next_level()
-            left = BinaryOpNode(left, op, right)
+    def parse_expression(self, min_precedence: int = 1) -> ASTNode:
+        """
+        Parse an expression by precedence climbing. Operators bind tighter
+        the higher their entry in _PRECEDENCE; all are left-associative.
+        """
+        left = self.parse_primary()
+        # Runs once per operand, so the token is read straight from the list
+        # (the EOF sentinel keeps the index valid) with the table bound locally
+        tokens = self.tokens
+        precedence_of = _PRECEDENCE.get
+        while True:
+            token = tokens[self.pos]
+            precedence = precedence_of(token.type)
+            if precedence is None or precedence < min_precedence:
+                break
+            self.pos += 1
+            right = self.parse_expression(precedence + 1)
+            # Literal-only operations are folded as soon as they are built
+            left = fold_binary(left, token.value, right)
         return left
 
-    def parse_comparison(self) -> ASTNode:
-        """Parse comparison operators (==, !=, <, >, etc.)."""
-        return self._parse_binary_op(self.parse_addition, ['EQ', 'NEQ', 'LT', 'GT', 'LTE', 'GTE'])
-
-    def parse_addition(self) -> ASTNode:
-        """Parse addition and subtraction."""
-        return self._parse_binary_op(self.parse_multiplication, ['PLUS', 'MINUS'])
-
-    def parse_multiplication(self) -> ASTNode:
-        """Parse multiplication, division, and modulo."""
-        return self._parse_binary_op(self.parse_power, ['MULTIPLY', 'DIVIDE', 'MODULO'])
-
-    def parse_power(self) -> ASTNode:
-        """Parse the power operator (**)."""
-        return self._parse_binary_op(self.parse_primary, ['POWER'])
+    def _variable_node(self, token: Token) -> VariableNode:
+        node = self._var_cache.get(token.value)
+        if node is None:
+            node = self._var_cache[token.value] = VariableNode(token.value)
+        return node
 
     def parse_primary(self) -> ASTNode:
         """Parse primary expressions (literals, variables, parentheses)."""
         token = self.consume()
-        
-        if token.type == 'NUMBER':
-            return NumberNode(float(token.value))
-        elif token.type == 'STRING':
-            # The token value includes quotes, so we strip them.
-            return StringNode(token.value[1:-1])
-        elif token.type == 'IDENTIFIER':
-            return VariableNode(token.value)
+
+        handler = self._primary_dispatch.get(token.type)
+        if handler:
+            return handler(token)
         elif token.type == 'LPAREN':
             expr = self.parse_expression()
             self.consume('RPAREN')
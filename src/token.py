@@ -3,11 +3,10 @@ Defines the Token data structure used by the lexer and parser.
 """
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """Represents a token with its type, value, and position in the source code."""
     type: str
     value: str
     line: int
     column: int
-